@@ -2,6 +2,23 @@ from flask import Flask
 from dotenv import load_dotenv
 import os
 
+# Security headers added to every response
+SECURITY_HEADERS = {
+    # Prevent XSS
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+    # CSP (Content Security Policy)
+    'Content-Security-Policy': (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://unpkg.com; "
+        "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://cdn.tailwindcss.com; "
+        "font-src 'self' https://fonts.gstatic.com; "
+        "img-src 'self' data:; "
+        "connect-src 'self';"
+    ),
+}
+
 def create_app():
     # Load environment variables
     load_dotenv()
@@ -58,21 +75,8 @@ def create_app():
             duration = time.time() - g.start_time
             log_performance(request.endpoint or request.path, duration)
         
-        # Prevent XSS
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        
-        # CSP (Content Security Policy)
-        csp = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.tailwindcss.com https://unpkg.com; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://cdn.tailwindcss.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            "img-src 'self' data:; "
-            "connect-src 'self';"
-        )
-        response.headers['Content-Security-Policy'] = csp
+        for header, value in SECURITY_HEADERS.items():
+            response.headers[header] = value
         
         return response
     
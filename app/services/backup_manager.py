@@ -21,8 +21,20 @@ import logging
 import hashlib
 from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# File suffix per compression method
+COMPRESSION_SUFFIXES = {
+    "zstd": ".zst",
+    "gzip": ".gz"
+}
+
 
 @dataclass  
 class BackupInfo:
@@ -58,14 +70,25 @@ class BackupManager:
         self._scheduler_running = False
         self._scheduler_thread = None
         
-    def create_backup(self, backup_type: str = "manual", compress: bool = True) -> BackupInfo:
-        """Create a new database backup"""
+    def create_backup(self, backup_type: str = "manual", compress: bool = True,
+                      compression: str = "zstd") -> BackupInfo:
+        """Create a new database backup
+        
+        Compressed backups use zstd when the zstandard package is installed
+        and fall back to gzip otherwise.
+        """
         
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression method: {compression}")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "gzip"
+        
+        created_at = datetime.now()
+        timestamp = created_at.strftime('%Y%m%d_%H%M%S')
         backup_name = f"portal_{backup_type}_{timestamp}.db"
         
         if compress:
-            backup_name += ".gz"
+            backup_name += COMPRESSION_SUFFIXES[compression]
             
         backup_path = self.backup_dir / backup_name
         
@@ -75,9 +98,7 @@ class BackupManager:
             
             if compress:
                 # Create compressed backup
-                with open(self.database_path, 'rb') as f_in:
-                    with gzip.open(backup_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                self._compress_file(self.database_path, backup_path, compression)
             else:
                 # Create uncompressed backup using SQLite backup API
                 source = sqlite3.connect(str(self.database_path))
@@ -104,7 +125,7 @@ class BackupManager:
                 path=str(backup_path),
                 size_bytes=backup_size,
                 size_mb=backup_size / (1024 * 1024),
-                created_at=datetime.now(),
+                created_at=created_at,
                 backup_type=backup_type,
                 checksum=checksum,
                 compressed=compress
@@ -123,6 +144,29 @@ class BackupManager:
                 backup_path.unlink()  # Clean up failed backup
             raise
 
+    def _compress_file(self, source: Path, target: Path, compression: str):
+        """Write a compressed copy of source to target"""
+        with open(source, 'rb') as f_in:
+            if compression == "zstd":
+                with open(target, 'wb') as f_out:
+                    zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(f_in, f_out)
+            else:
+                with gzip.open(target, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+
+    def _open_compressed(self, backup_path: Path):
+        """Open a compressed backup for reading, based on its file suffix"""
+        if backup_path.suffix == COMPRESSION_SUFFIXES["zstd"]:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard package is required to read .zst backups")
+            f = open(backup_path, 'rb')
+            try:
+                return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+            except Exception:
+                f.close()
+                raise
+        return gzip.open(backup_path, 'rb')
+
     def _calculate_file_checksum(self, filepath: Path) -> str:
         """Calculate SHA256 checksum of backup file"""
         hash_sha256 = hashlib.sha256()
@@ -137,7 +181,7 @@ class BackupManager:
         try:
             if compressed:
                 # Verify compressed backup by decompressing and checking
-                with gzip.open(backup_path, 'rb') as f:
+                with self._open_compressed(backup_path) as f:
                     # Try to read first few bytes to verify it's valid
                     header = f.read(100)
                     if not header.startswith(b'SQLite format 3'):
@@ -203,7 +247,7 @@ class BackupManager:
                     created_at=datetime.fromtimestamp(stat.st_ctime),
                     backup_type=file_backup_type,
                     checksum=self._calculate_file_checksum(backup_file),
-                    compressed=backup_file.suffix == ".gz"
+                    compressed=backup_file.suffix in COMPRESSION_SUFFIXES.values()
                 )
                 backups.append(backup_info)
                 
@@ -232,9 +276,9 @@ class BackupManager:
             current_backup = self.create_backup("pre_restore")
             
             # Restore from backup
-            if backup_path.suffix == ".gz":
+            if backup_path.suffix in COMPRESSION_SUFFIXES.values():
                 # Decompress and restore
-                with gzip.open(backup_path, 'rb') as f_in:
+                with self._open_compressed(backup_path) as f_in:
                     with open(self.database_path, 'wb') as f_out:
                         shutil.copyfileobj(f_in, f_out)
             else:
@@ -574,8 +618,91 @@ class PostgreSQLMigrator:
         conn.close()
         return export_data
 
-    def create_migration_package(self, output_dir: str = "migration_package") -> Dict[str, Any]:
-        """Create complete migration package"""
+    def export_data_csv(self, output_dir: Path) -> Dict[str, Any]:
+        """Export every table as CSV plus a psql script that loads them with COPY
+        
+        Uses the PostgreSQL CSV convention: NULL is an unquoted empty field and
+        every non-null text value is quoted, so empty strings stay distinct.
+        """
+        
+        csv_dir = output_dir / "csv"
+        csv_dir.mkdir(exist_ok=True)
+        
+        conn = sqlite3.connect(self.sqlite_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+        tables = [row[0] for row in cursor.fetchall()]
+        
+        load_lines = [
+            "-- PostgreSQL bulk data load (run with psql from the package directory)",
+            f"-- Source: {self.sqlite_path}",
+            "",
+            "BEGIN;",
+        ]
+        sequence_lines = []
+        row_counts = {}
+        
+        for table_name in tables:
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            table_info = cursor.fetchall()
+            columns = [col[1] for col in table_info]
+            serial_keys = [col[1] for col in table_info if col[5] and col[2] == 'INTEGER']
+            
+            csv_file = csv_dir / f"{table_name}.csv"
+            row_count = 0
+            with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+                f.write(",".join(self._csv_field(col) for col in columns) + "\n")
+                for row in cursor.execute(f"SELECT * FROM {table_name}"):
+                    f.write(",".join(self._csv_field(value) for value in row) + "\n")
+                    row_count += 1
+            row_counts[table_name] = row_count
+            
+            load_lines.append(
+                f"\\copy {table_name} ({', '.join(columns)}) FROM 'csv/{table_name}.csv' "
+                f"WITH (FORMAT csv, HEADER true)"
+            )
+            
+            # SERIAL columns need their sequences moved past the copied ids;
+            # is_called=false so an empty table still starts at 1
+            if len(serial_keys) == 1:
+                key = serial_keys[0]
+                sequence_lines.append(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', '{key}'), "
+                    f"COALESCE(MAX({key}), 0) + 1, false) FROM {table_name};"
+                )
+        
+        conn.close()
+        
+        load_lines.extend(["", *sequence_lines, "", "COMMIT;", "", "ANALYZE;"])
+        load_file = output_dir / "load_data.sql"
+        with open(load_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(load_lines) + "\n")
+        
+        return {
+            "csv_dir": str(csv_dir),
+            "load_script": str(load_file),
+            "row_counts": row_counts
+        }
+
+    @staticmethod
+    def _csv_field(value: Any) -> str:
+        """Format one value for COPY ... (FORMAT csv) with the default NULL ''
+        
+        csv.QUOTE_NOTNULL would do this, but it needs Python 3.12.
+        """
+        if value is None:
+            return ""
+        if isinstance(value, (int, float)):
+            return str(value)
+        return '"' + str(value).replace('"', '""') + '"'
+
+    def create_migration_package(self, output_dir: str = "migration_package", use_copy: bool = False) -> Dict[str, Any]:
+        """Create complete migration package
+        
+        With use_copy, the package also contains per-table CSV files and a
+        load_data.sql script that bulk-loads them with COPY.
+        """
         
         package_dir = Path(output_dir)
         package_dir.mkdir(exist_ok=True)
@@ -600,6 +727,12 @@ class PostgreSQLMigrator:
                 json.dump(data_export, f, indent=2, default=str)
             package_info["files"]["data"] = str(data_file)
             
+            # Export CSV files for COPY-based bulk loading
+            if use_copy:
+                csv_export = self.export_data_csv(package_dir)
+                package_info["files"]["csv"] = csv_export["csv_dir"]
+                package_info["files"]["load_script"] = csv_export["load_script"]
+            
             # Create migration instructions
             instructions = self._generate_migration_instructions()
             instructions_file = package_dir / "MIGRATION_INSTRUCTIONS.md"
@@ -654,6 +787,12 @@ psql -d qr_info_portal -U portal_user -f postgresql_schema.sql
 ```
 
 ### 4. Import Data
+If the package was created with `use_copy=True`, bulk-load the CSV files with COPY:
+```bash
+psql -d qr_info_portal -U portal_user -f load_data.sql
+```
+
+Otherwise import from the JSON export:
 ```python
 python validate_migration.py --import-data data_export.json
 ```
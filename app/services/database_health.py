@@ -12,7 +12,7 @@ import psutil
 import threading
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from sqlmodel import Session, select, text
@@ -57,6 +57,11 @@ class DatabaseHealthMonitor:
             "min_cache_hit_ratio": 0.85
         }
         
+        # PRAGMA integrity_check reads every page, so reuse a passing result
+        # while the database files are unchanged
+        self.integrity_cache_ttl_seconds = 300
+        self._integrity_cache: Optional[Tuple[Tuple[int, int], float, Dict[str, str]]] = None
+        
     def start_monitoring(self):
         """Start background health monitoring"""
         if self.is_monitoring:
@@ -275,6 +280,19 @@ class DatabaseHealthMonitor:
             
         return alerts
 
+    def _database_signature(self) -> Tuple[int, int]:
+        """Modification times of the database file and its WAL file"""
+        database = engine.url.database
+        if not database or database == ":memory:":
+            return (0, 0)
+        signature = []
+        for path in (Path(database), Path(f"{database}-wal")):
+            try:
+                signature.append(path.stat().st_mtime_ns)
+            except OSError:
+                signature.append(0)
+        return tuple(signature)
+
     def run_health_check(self) -> Dict[str, Any]:
         """Run comprehensive health check"""
         
@@ -296,13 +314,30 @@ class DatabaseHealthMonitor:
             health_check["overall_status"] = "critical"
             
         # Table integrity test
-        try:
-            with Session(engine) as session:
-                session.exec(text("PRAGMA integrity_check")).first()
-                health_check["checks"]["database_integrity"] = {"status": "pass", "message": "Database integrity OK"}
-        except Exception as e:
-            health_check["checks"]["database_integrity"] = {"status": "fail", "message": str(e)}
-            health_check["overall_status"] = "critical"
+        signature = self._database_signature()
+        cached = self._integrity_cache
+        if (cached and cached[0] == signature
+                and time.monotonic() - cached[1] < self.integrity_cache_ttl_seconds):
+            health_check["checks"]["database_integrity"] = dict(cached[2])
+        else:
+            try:
+                with Session(engine) as session:
+                    problems = [row[0] for row in session.exec(text("PRAGMA integrity_check")).all()]
+                if problems == ["ok"]:
+                    integrity = {"status": "pass", "message": "Database integrity OK"}
+                    health_check["checks"]["database_integrity"] = integrity
+                    self._integrity_cache = (signature, time.monotonic(), dict(integrity))
+                else:
+                    health_check["checks"]["database_integrity"] = {
+                        "status": "fail",
+                        "message": "; ".join(str(p) for p in problems[:10]) or "No integrity_check result"
+                    }
+                    health_check["overall_status"] = "critical"
+                    self._integrity_cache = None
+            except Exception as e:
+                health_check["checks"]["database_integrity"] = {"status": "fail", "message": str(e)}
+                health_check["overall_status"] = "critical"
+                self._integrity_cache = None
             
         # Index usage test
         try:
@@ -16,12 +16,26 @@ from flask import request, session, current_app, g
 from werkzeug.security import safe_str_cmp
 import logging
 
+# Patterns stripped from user input by SecurityService.sanitize_input
+DANGEROUS_INPUT_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'<script.*?</script>',
+    r'javascript:',
+    r'vbscript:',
+    r'on\w+\s*=',  # onclick, onload, etc.
+    r'<iframe',
+    r'<object',
+    r'<embed'
+))
+
 class SecurityService:
     """Comprehensive security service for the application"""
     
     def __init__(self):
         self.config = self._load_security_config()
         self.logger = logging.getLogger(__name__)
+        # Header values only depend on the config loaded above, so build them once
+        self._csp_headers: Dict[bool, str] = {}
+        self._security_headers: Optional[Dict[str, str]] = None
         
     def _load_security_config(self) -> Dict[str, Any]:
         """Load security configuration"""
@@ -45,6 +59,13 @@ class SecurityService:
         }
     
     def get_csp_header(self, is_kiosk: bool = False) -> str:
+        """Return the Content Security Policy header (cached per kiosk mode)"""
+        is_kiosk = bool(is_kiosk)
+        if is_kiosk not in self._csp_headers:
+            self._csp_headers[is_kiosk] = self._build_csp_header(is_kiosk)
+        return self._csp_headers[is_kiosk]
+    
+    def _build_csp_header(self, is_kiosk: bool) -> str:
         """Generate Content Security Policy header"""
         csp_config = self.config.get('security', {}).get('csp', {})
         
@@ -96,6 +117,12 @@ class SecurityService:
         return '; '.join(csp_parts)
     
     def get_security_headers(self) -> Dict[str, str]:
+        """Return a copy of all security headers (built once from the config)"""
+        if self._security_headers is None:
+            self._security_headers = self._build_security_headers()
+        return dict(self._security_headers)
+    
+    def _build_security_headers(self) -> Dict[str, str]:
         """Generate all security headers"""
         headers = {}
         
@@ -161,18 +188,8 @@ class SecurityService:
             input_value = html.escape(input_value)
         
         # Remove potentially dangerous patterns
-        dangerous_patterns = [
-            r'<script.*?</script>',
-            r'javascript:',
-            r'vbscript:',
-            r'on\w+\s*=',  # onclick, onload, etc.
-            r'<iframe',
-            r'<object',
-            r'<embed'
-        ]
-        
-        for pattern in dangerous_patterns:
-            input_value = re.sub(pattern, '', input_value, flags=re.IGNORECASE)
+        for pattern in DANGEROUS_INPUT_PATTERNS:
+            input_value = pattern.sub('', input_value)
         
         return input_value.strip()
     
@@ -0,0 +1,162 @@
+"""
+Unit Tests für Backup Manager und PostgreSQL Migration
+Testet komprimierte Backups und CSV/COPY Export gegen eine temporäre SQLite Datenbank
+"""
+
+import csv
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from app.services import backup_manager
+from app.services.backup_manager import BackupManager, PostgreSQLMigrator
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Small SQLite database with tricky values and an empty table"""
+    db_path = tmp_path / "portal.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript("""
+        CREATE TABLE announcement (id INTEGER PRIMARY KEY, title TEXT, body TEXT);
+        CREATE TABLE settings (id INTEGER PRIMARY KEY, value TEXT);
+    """)
+    conn.executemany(
+        "INSERT INTO announcement (id, title, body) VALUES (?, ?, ?)",
+        [
+            (1, "Hinweis", None),
+            (2, 'Komma, "Zitat"\nZeile 2', ""),
+            (3, "\\N", "Text"),
+        ]
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def manager(sqlite_db, tmp_path):
+    """BackupManager writing into a temporary backup directory"""
+    return BackupManager(str(sqlite_db), backup_dir=str(tmp_path / "backups"))
+
+
+def _announcement_ids(db_path):
+    conn = sqlite3.connect(str(db_path))
+    ids = [row[0] for row in conn.execute("SELECT id FROM announcement ORDER BY id")]
+    conn.close()
+    return ids
+
+
+class TestCompressedBackups:
+    """Tests für zstd/gzip Backups inkl. Restore"""
+
+    @pytest.mark.parametrize("compression, suffix", [
+        pytest.param("zstd", ".zst", marks=pytest.mark.skipif(
+            not backup_manager.ZSTD_AVAILABLE, reason="zstandard not installed")),
+        ("gzip", ".gz"),
+    ])
+    def test_backup_round_trip(self, manager, sqlite_db, compression, suffix):
+        """create -> verify -> list -> restore"""
+        info = manager.create_backup("manual", compression=compression)
+        backup_path = manager.backup_dir / info.name
+
+        assert info.name.endswith(f".db{suffix}")
+        assert info.compressed is True
+        assert manager._verify_backup(backup_path, True)["valid"] is True
+
+        listed = {b.name: b for b in manager.list_backups("manual")}
+        assert listed[info.name].compressed is True
+
+        conn = sqlite3.connect(str(sqlite_db))
+        conn.execute("DELETE FROM announcement")
+        conn.commit()
+        conn.close()
+
+        result = manager.restore_backup(info.name, confirm=True)
+
+        assert result["success"] is True
+        assert _announcement_ids(sqlite_db) == [1, 2, 3]
+
+    def test_zstd_falls_back_to_gzip(self, manager):
+        """Ohne zstandard wird gzip verwendet"""
+        with patch.object(backup_manager, "ZSTD_AVAILABLE", False):
+            info = manager.create_backup("manual", compression="zstd")
+
+        assert info.name.endswith(".db.gz")
+        assert manager._verify_backup(manager.backup_dir / info.name, True)["valid"] is True
+
+    def test_unknown_compression_rejected(self, manager):
+        """Unbekannte Kompression -> ValueError"""
+        with pytest.raises(ValueError):
+            manager.create_backup("manual", compression="lzma")
+        assert list(manager.backup_dir.iterdir()) == []
+
+
+class TestPostgreSQLCsvExport:
+    """Tests für export_data_csv und create_migration_package(use_copy=True)"""
+
+    def test_csv_values_round_trip(self, sqlite_db, tmp_path):
+        """NULL als leeres Feld, Text immer gequotet"""
+        migrator = PostgreSQLMigrator(str(sqlite_db))
+        result = migrator.export_data_csv(tmp_path)
+
+        assert result["row_counts"] == {"announcement": 3, "settings": 0}
+
+        content = (tmp_path / "csv" / "announcement.csv").read_text(encoding="utf-8")
+
+        assert content == (
+            '"id","title","body"\n'
+            '1,"Hinweis",\n'
+            '2,"Komma, ""Zitat""\nZeile 2",""\n'
+            '3,"\\N","Text"\n'
+        )
+
+    def test_csv_readable_by_csv_module(self, sqlite_db, tmp_path):
+        """Quoting ist gültiges CSV"""
+        PostgreSQLMigrator(str(sqlite_db)).export_data_csv(tmp_path)
+
+        with open(tmp_path / "csv" / "announcement.csv", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+
+        assert rows[2] == ["2", 'Komma, "Zitat"\nZeile 2', ""]
+        # Ein gespeicherter Text \N ist kein NULL-Marker
+        assert rows[3] == ["3", "\\N", "Text"]
+
+    def test_empty_table_exports_header_only(self, sqlite_db, tmp_path):
+        """Leere Tabelle -> nur Header"""
+        PostgreSQLMigrator(str(sqlite_db)).export_data_csv(tmp_path)
+
+        with open(tmp_path / "csv" / "settings.csv", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+
+        assert rows == [["id", "value"]]
+
+    def test_load_script(self, sqlite_db, tmp_path):
+        """load_data.sql lädt jede Tabelle und setzt Sequenzen korrekt"""
+        result = PostgreSQLMigrator(str(sqlite_db)).export_data_csv(tmp_path)
+        script = (tmp_path / "load_data.sql").read_text(encoding="utf-8")
+
+        assert result["load_script"] == str(tmp_path / "load_data.sql")
+        assert ("\\copy announcement (id, title, body) FROM 'csv/announcement.csv' "
+                "WITH (FORMAT csv, HEADER true)") in script
+        assert "NULL '" not in script
+        assert "\\copy settings (id, value) FROM 'csv/settings.csv'" in script
+        # Nächste id ist MAX+1 bzw. 1 bei leerer Tabelle
+        assert ("SELECT setval(pg_get_serial_sequence('settings', 'id'), "
+                "COALESCE(MAX(id), 0) + 1, false) FROM settings;") in script
+        assert script.index("COMMIT;") < script.index("ANALYZE;")
+
+    def test_migration_package_files(self, sqlite_db, tmp_path):
+        """use_copy ergänzt csv und load_script im Paket"""
+        migrator = PostgreSQLMigrator(str(sqlite_db))
+
+        package = migrator.create_migration_package(str(tmp_path / "default"))
+        assert package["success"] is True
+        assert set(package["files"]) == {"schema", "data", "instructions", "validation"}
+
+        package = migrator.create_migration_package(str(tmp_path / "copy"), use_copy=True)
+        assert package["success"] is True
+        assert set(package["files"]) == {
+            "schema", "data", "csv", "load_script", "instructions", "validation"
+        }
+        assert package["files"]["load_script"] == str(tmp_path / "copy" / "load_data.sql")
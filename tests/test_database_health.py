@@ -0,0 +1,104 @@
+"""
+Unit Tests für Database Health Monitoring
+Testet das Caching von PRAGMA integrity_check
+"""
+
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+from sqlalchemy import event
+from sqlmodel import create_engine
+
+from app.services import database_health
+from app.services.database_health import DatabaseHealthMonitor
+
+
+@pytest.fixture
+def temp_engine(tmp_path):
+    """SQLite engine on a temporary database file"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'health.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE item (id INTEGER PRIMARY KEY)")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def integrity_calls(temp_engine):
+    """Counts PRAGMA integrity_check executions on the temp engine"""
+    calls = []
+
+    @event.listens_for(temp_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if "integrity_check" in statement:
+            calls.append(statement)
+
+    return calls
+
+
+class TestIntegrityCache:
+    """Tests für den integrity_check Cache"""
+
+    def test_signature_uses_engine_database(self, temp_engine):
+        """Signatur basiert auf der Datenbank der Engine"""
+        with patch.object(database_health, "engine", temp_engine):
+            signature = DatabaseHealthMonitor()._database_signature()
+
+        assert signature[0] == os.stat(temp_engine.url.database).st_mtime_ns
+        assert signature[0] != 0
+
+    def test_cache_reused_while_signature_unchanged(self, temp_engine, integrity_calls):
+        """Unveränderte Datenbank -> integrity_check nur einmal"""
+        monitor = DatabaseHealthMonitor()
+        with patch.object(database_health, "engine", temp_engine), \
+                patch.object(monitor, "_database_signature", return_value=(1, 1)):
+            first = monitor.run_health_check()
+            second = monitor.run_health_check()
+
+        assert len(integrity_calls) == 1
+        assert first["checks"]["database_integrity"]["status"] == "pass"
+        assert second["checks"]["database_integrity"]["status"] == "pass"
+
+    def test_cache_invalidated_when_signature_changes(self, temp_engine, integrity_calls):
+        """Geänderte Datenbank -> integrity_check erneut"""
+        monitor = DatabaseHealthMonitor()
+        with patch.object(database_health, "engine", temp_engine), \
+                patch.object(monitor, "_database_signature", side_effect=[(1, 1), (2, 1)]):
+            monitor.run_health_check()
+            monitor.run_health_check()
+
+        assert len(integrity_calls) == 2
+
+    def test_cache_expires_after_ttl(self, temp_engine, integrity_calls):
+        """Abgelaufene TTL -> integrity_check erneut"""
+        monitor = DatabaseHealthMonitor()
+        monitor.integrity_cache_ttl_seconds = 0
+        with patch.object(database_health, "engine", temp_engine), \
+                patch.object(monitor, "_database_signature", return_value=(1, 1)):
+            monitor.run_health_check()
+            monitor.run_health_check()
+
+        assert len(integrity_calls) == 2
+
+    def test_failed_check_is_reported_and_not_cached(self, temp_engine):
+        """Probleme aus integrity_check -> critical, Cache verworfen"""
+        monitor = DatabaseHealthMonitor()
+        with patch.object(database_health, "engine", temp_engine), \
+                patch.object(monitor, "_database_signature", side_effect=[(1, 1), (2, 1)]):
+            monitor.run_health_check()
+            assert monitor._integrity_cache is not None
+
+            session = MagicMock()
+            session.exec.return_value.all.return_value = [
+                ("*** in database main ***",),
+                ("row 2 missing from index idx_item",),
+            ]
+            with patch.object(database_health, "Session") as session_cls:
+                session_cls.return_value.__enter__.return_value = session
+                result = monitor.run_health_check()
+
+        integrity = result["checks"]["database_integrity"]
+        assert integrity["status"] == "fail"
+        assert "row 2 missing from index" in integrity["message"]
+        assert result["overall_status"] == "critical"
+        assert monitor._integrity_cache is None
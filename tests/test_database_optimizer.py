@@ -0,0 +1,179 @@
+"""
+Unit Tests für Database Optimizer
+Testet die Erkennung von Full Table Scans in EXPLAIN QUERY PLAN
+den Cache der Index-Nutzung und maintenance_pragmas
+"""
+
+import sqlite3
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, text
+
+from app.database_optimizer import DatabaseOptimizer
+
+
+@pytest.fixture
+def optimizer(tmp_path):
+    """Optimizer on a temporary SQLite database"""
+    optimizer = DatabaseOptimizer(f"sqlite:///{tmp_path / 'optimizer.db'}")
+    with Session(optimizer.connection_pool) as session:
+        session.exec(text("CREATE TABLE item (id INTEGER PRIMARY KEY, lang TEXT)"))
+        session.commit()
+    yield optimizer
+    optimizer.close()
+
+
+@pytest.fixture
+def plan_calls(optimizer):
+    """Counts EXPLAIN QUERY PLAN executions on the optimizer engine"""
+    calls = []
+
+    @event.listens_for(optimizer.connection_pool, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("EXPLAIN QUERY PLAN"):
+            calls.append(statement)
+
+    return calls
+
+
+class TestIndexUsageCache:
+    """Tests für den EXPLAIN QUERY PLAN Cache in monitor_query_performance"""
+
+    def test_plan_reused_for_same_query(self, optimizer, plan_calls):
+        """Gleicher Query-Text -> nur ein EXPLAIN"""
+        first = optimizer.monitor_query_performance("SELECT * FROM item WHERE id = 1")
+        second = optimizer.monitor_query_performance("SELECT * FROM item WHERE id = 1")
+
+        assert len(plan_calls) == 1
+        assert first.used_index == second.used_index
+
+    def test_cache_cleared_by_vacuum_optimize(self, optimizer, plan_calls):
+        """ANALYZE ändert die Planner-Statistik -> neues EXPLAIN"""
+        optimizer.monitor_query_performance("SELECT * FROM item WHERE lang = 'de'")
+        optimizer.vacuum_optimize()
+        optimizer.monitor_query_performance("SELECT * FROM item WHERE lang = 'de'")
+
+        assert len(plan_calls) == 2
+
+    def test_cache_cleared_by_new_indexes(self, optimizer, plan_calls):
+        """Neue Indizes -> neues EXPLAIN"""
+        optimizer.monitor_query_performance("SELECT * FROM item WHERE lang = 'de'")
+        optimizer.create_performance_indexes()
+        optimizer.monitor_query_performance("SELECT * FROM item WHERE lang = 'de'")
+
+        assert len(plan_calls) == 2
+
+    def test_cache_is_bounded_lru(self, optimizer, plan_calls):
+        """Größe begrenzt, zuletzt genutzte Einträge bleiben"""
+        optimizer.index_usage_cache_size = 2
+        q1, q2, q3 = (f"SELECT * FROM item WHERE id = {i}" for i in (1, 2, 3))
+
+        for query in (q1, q2, q1, q3):
+            optimizer.monitor_query_performance(query)
+        assert list(optimizer._index_usage_cache) == [q1, q3]
+        assert len(plan_calls) == 3
+
+        optimizer.monitor_query_performance(q1)
+        optimizer.monitor_query_performance(q2)
+        assert len(plan_calls) == 4
+
+
+def _pragmas(optimizer):
+    with Session(optimizer.connection_pool) as session:
+        synchronous = session.exec(text("PRAGMA synchronous")).first()[0]
+        cache_size = session.exec(text("PRAGMA cache_size")).first()[0]
+    return synchronous, cache_size
+
+
+class TestMaintenancePragmas:
+    """Tests für maintenance_pragmas"""
+
+    def test_pragmas_set_and_restored(self, optimizer):
+        """synchronous/cache_size im Block geändert, danach wiederhergestellt"""
+        before = _pragmas(optimizer)
+        assert before != (0, -131072)
+
+        with optimizer.maintenance_pragmas(cache_size_kb=131072):
+            assert _pragmas(optimizer) == (0, -131072)
+
+        assert _pragmas(optimizer) == before
+
+    def test_pragmas_restored_when_body_raises(self, optimizer):
+        """Auch bei Exception wird zurückgesetzt"""
+        before = _pragmas(optimizer)
+
+        with pytest.raises(RuntimeError):
+            with optimizer.maintenance_pragmas():
+                assert _pragmas(optimizer) == (0, -262144)
+                raise RuntimeError("index build failed")
+
+        assert _pragmas(optimizer) == before
+
+
+class TestFullTableScans:
+    """Tests für _find_full_table_scans"""
+
+    def test_old_plan_format(self, optimizer):
+        """SQLite < 3.36: SCAN TABLE x"""
+        plan = [
+            (0, 0, 0, "SCAN TABLE announcement"),
+            (0, 1, 1, "SEARCH TABLE availability USING INDEX idx_date (availability_date=?)"),
+            (0, 0, 0, "SCAN TABLE hourexception USING COVERING INDEX idx_exc"),
+        ]
+
+        assert optimizer._find_full_table_scans(plan) == ["SCAN TABLE announcement"]
+
+    def test_new_plan_format(self, optimizer):
+        """SQLite 3.36+: SCAN x"""
+        plan = [
+            (2, 0, 0, "SCAN announcement"),
+            (4, 0, 0, "SEARCH availability USING INDEX idx_date (availability_date=?)"),
+            (6, 0, 0, "SCAN hourexception USING COVERING INDEX idx_exc"),
+            (8, 0, 0, "SCAN CONSTANT ROW"),
+        ]
+
+        assert optimizer._find_full_table_scans(plan) == ["SCAN announcement"]
+
+    def test_materialized_cte_and_aliases_skipped(self, optimizer):
+        """Materialisierte CTEs und deren Aliase sind keine Tabellen-Scans"""
+        query = "WITH w AS MATERIALIZED (SELECT lang FROM item) SELECT * FROM w, w w2"
+        plan = [
+            (3, 0, 0, "MATERIALIZE w"),
+            (6, 3, 0, "SCAN item"),
+            (18, 0, 0, "SCAN w"),
+            (20, 0, 0, "SCAN w2"),
+        ]
+
+        assert optimizer._find_full_table_scans(plan, query) == ["SCAN item"]
+
+    def test_subqueries_and_coroutines_skipped(self, optimizer):
+        """Subqueries (alt und neu) und Co-Routinen werden ignoriert"""
+        plan = [
+            (1, 0, 0, "MATERIALIZE 1"),
+            (2, 1, 0, "SCAN TABLE item"),
+            (3, 0, 0, "SCAN SUBQUERY 1"),
+            (4, 0, 0, "CO-ROUTINE (subquery-2)"),
+            (5, 4, 0, "SCAN item"),
+            (6, 0, 0, "SCAN (subquery-2)"),
+        ]
+
+        assert optimizer._find_full_table_scans(plan) == ["SCAN TABLE item", "SCAN item"]
+
+    def test_analyze_query_performance_reports_scan(self, optimizer):
+        """Echter Query Plan der installierten SQLite Version"""
+        scan = optimizer.analyze_query_performance("SELECT * FROM item WHERE lang = 'de'")
+        lookup = optimizer.analyze_query_performance("SELECT * FROM item WHERE id = 1")
+
+        assert len(scan["full_table_scans"]) == 1
+        assert "Full table scan" in scan["recommendations"][0]
+        assert lookup["full_table_scans"] == []
+
+    @pytest.mark.skipif(sqlite3.sqlite_version_info < (3, 35, 0),
+                        reason="AS MATERIALIZED requires SQLite 3.35+")
+    def test_analyze_query_performance_materialized_cte(self, optimizer):
+        """Echter Plan: Scans der materialisierten CTE zählen nicht"""
+        cte = optimizer.analyze_query_performance(
+            "WITH w AS MATERIALIZED (SELECT lang FROM item WHERE id = 1) SELECT * FROM w, w w2"
+        )
+
+        assert cte["full_table_scans"] == []